@@ -1,84 +1,486 @@
+from __future__ import annotations
+
+import array
+import functools
+import io
+import itertools
 import sys
-from typing import TextIO, TypeVar, Union, Tuple, List, Optional, Type
+import weakref
+
+# 运行时不导入 typing 模块, 类型注解仅供类型检查器使用
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (
+        BinaryIO,
+        Callable,
+        Iterator,
+        List,
+        Optional,
+        TextIO,
+        Tuple,
+        Type,
+        TypeVar,
+        Union,
+    )
+
+    T = TypeVar("T")
+    AnyStr = TypeVar("AnyStr", str, bytes)
+    # 输入源: 文本流, 或 sys.stdin.buffer 等二进制流
+    InputFile = Union[TextIO, BinaryIO]
+
+# read_array 支持的元素类型及其 array 类型码
+_ARRAY_TYPECODES = {int: "q", float: "d"}
+
 
-_buffer = None
+def _split(text: AnyStr, sep: Optional[AnyStr]) -> List[AnyStr]:
+    """
+    将一行切分为字符串列表
+
+    自定义分隔符时, text 应已去除首尾空白; 每个部分去除前导空白,
+    行尾分隔符后的空串不算一个值
+
+    """
+    if sep is None:
+        # split() 自身会跳过首尾空白和换行符, 无需先 strip()
+        return text.split()
+    parts = text.split(sep)
+    if len(parts) > 1 and not parts[-1]:
+        parts.pop()
+    return [part.lstrip() for part in parts]
 
 
-def clear_buffer() -> None:
+class _Reader:
+    """
+    单个输入源的读取状态
+
+    输入源逐行调用 readline(), 不会预读后续行, 可与 input() 等混用。
+    二进制输入源(如 sys.stdin.buffer)直接按 bytes 切分, 省去逐行解码,
+    int/float 可直接由 bytes 转换, 其他类型在转换前才解码。
+    注意 bytes 只按 ASCII 空白切分, 不间断空格(U+00A0)等非 ASCII 空白不会作为分隔
+
+    读取状态不引用输入源本身, 输入源由每次调用传入,
+    因此以输入源为键的弱引用字典可以在输入源释放后回收对应状态
+
+    属性:
+        binary: 是否为二进制输入源
+        text: 当前行(使用自定义分隔符时已去除首尾空白)
+        sep: 切分当前行所用的分隔符
+        split_sep: 实际用于切分的分隔符(二进制输入源为编码后的 bytes)
+        tokens: 当前行切分后的字符串列表
+        index: tokens 中下一个待读取的位置
+    """
+
+    __slots__ = (
+        "binary",
+        "text",
+        "sep",
+        "split_sep",
+        "tokens",
+        "index",
+    )
+
+    def __init__(self, file: InputFile) -> None:
+        self.binary = isinstance(file, (io.RawIOBase, io.BufferedIOBase))
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        清空当前行缓冲区
+
+        """
+        self.text = ""
+        self.sep = None
+        self.split_sep = None
+        self.tokens = []
+        self.index = 0
+
+    def rest(self) -> AnyStr:
+        """
+        当前行尚未读取的部分
+
+        """
+        index = self.index
+        if index >= len(self.tokens):
+            return ""
+
+        # 只定位已读部分的结束位置, 不重新切分出已读的字符串
+        text, sep = self.text, self.split_sep
+        offset = 0
+        if sep is None:
+            for token in itertools.islice(self.tokens, index):
+                offset = text.find(token, offset) + len(token)
+            return text[offset:].strip()
+        for _ in range(index):
+            offset = text.find(sep, offset) + len(sep)
+        # 与逐个读取时保留的剩余部分一致: 分隔符之后的内容原样返回
+        return text[offset:]
+
+    def _load(self, text: AnyStr, sep: Optional[str]) -> None:
+        split_sep = sep
+        if sep is not None:
+            text = text.strip()
+            if self.binary:
+                split_sep = sep.encode()
+        self.text = text
+        self.sep = sep
+        self.split_sep = split_sep
+        self.tokens = _split(text, split_sep)
+        self.index = 0
+
+    def _ready(self, sep: Optional[str], file: InputFile) -> bool:
+        """
+        确保当前行还有按 sep 切分好的数据可读, 必要时读取新的一行
+
+        """
+        if self.index >= len(self.tokens):
+            text = file.readline()
+            if sep is None:
+                # 最常见的空白分隔: 直接切分, 省去 _load/_split 的函数调用
+                self.text = text
+                self.sep = self.split_sep = None
+                self.tokens = text.split()
+                self.index = 0
+            else:
+                self._load(text, sep)
+        elif sep != self.sep:
+            # 分隔符改变时按新分隔符重新切分剩余部分
+            self._load(self.rest(), sep)
+        return self.index < len(self.tokens)
+
+    def read_str(self, sep: Optional[str], file: InputFile) -> Optional[AnyStr]:
+        """
+        读取单个数据
+
+        参数:
+            sep: 分隔符 (可选)
+            file: 输入源
+
+        返回:
+            分割后的第一个字符串部分
+        """
+        tokens, index = self.tokens, self.index
+        if index >= len(tokens) or sep != self.sep:
+            if not self._ready(sep, file):
+                return None
+            tokens, index = self.tokens, self.index
+        self.index = index + 1
+        return tokens[index]
+
+    def read_strs(
+        self, n: int, sep: Optional[str], file: InputFile
+    ) -> List[AnyStr]:
+        """
+        一次读取 n 个字符串
+
+        直接截取当前行已切分好的部分, 不足 n 个时继续读取下一行
+
+        参数:
+            n: 读取数量
+            sep: 分隔符 (可选)
+            file: 输入源
+
+        返回:
+            长度为 n 的字符串列表
+        """
+        values = []
+        while len(values) < n:
+            if not self._ready(sep, file):
+                raise ValueError("List type requires non-null values")
+            index = self.index
+            end = index + n - len(values)
+            values.extend(self.tokens[index:end])
+            self.index = min(end, len(self.tokens))
+        return values
+
+    def readline(self, file: InputFile) -> str:
+        """
+        读取当前行剩余部分, 或在其为空时读取新的一行
+
+        """
+        rest = self.rest()
+        if rest:
+            self.clear()
+        else:
+            rest = file.readline().strip()
+        return rest.decode() if self.binary else rest
+
+
+# 导入时的标准输入及其读取状态
+_stdin = sys.stdin
+_default = _Reader(_stdin)
+
+# 其他输入源各自独立的读取状态
+_readers = weakref.WeakKeyDictionary()
+
+
+def _no_file() -> None:
+    """
+    不指向任何输入源的占位弱引用
+
+    """
+    return None
+
+
+# 最近一次使用的输入源(弱引用)及其读取状态, 连续读取同一输入源时省去字典查找
+_last_ref = _no_file
+_last_reader = _default
+
+# readline() 读完整行、且之后没有再调用 read() 等的文本输入源:
+# 它没有未读完的数据, readline() 可以不查看读取状态直接读取新的一行。
+# 导入时的标准输入本就由模块持有, 直接记录; 其他输入源只记录弱引用
+_idle = None
+_idle_ref = _no_file
+
+
+def _reader(file: InputFile) -> _Reader:
+    """
+    获取输入源对应的读取状态, 不存在时创建
+
+    调用方需先将 None 解析为 sys.stdin, 并自行处理导入时的标准输入(_default)
+
+    """
+    global _last_ref, _last_reader
+    if _last_ref() is file:
+        return _last_reader
+    try:
+        reader = _readers.get(file)
+        if reader is None:
+            reader = _readers[file] = _Reader(file)
+        _last_ref = weakref.ref(file)
+    except TypeError:
+        # 不支持弱引用的输入源无法保存状态, 使用临时读取状态,
+        # 当前行未读完的部分会在本次调用后丢弃
+        return _Reader(file)
+    _last_reader = reader
+    return reader
+
+
+def clear_buffer(file: Optional[InputFile] = None) -> None:
     """
     清空缓冲区
 
     用于在需要时清除读取的输入数据
+
+    参数:
+        file: 输入源 (可选, 默认清空所有输入源的缓冲区)
+    """
+    if file is not None:
+        (_default if file is _stdin else _reader(file)).clear()
+        return
+    _default.clear()
+    for reader in _readers.values():
+        reader.clear()
+
+
+_BOOL_TRUE = frozenset(("true", "True", "TRUE"))
+_BOOL_FALSE = frozenset(("false", "False", "FALSE"))
+
+
+def _parse_bool(value: str) -> bool:
+    """
+    将字符串解析为布尔值, 只接受 true/false (不区分大小写)
+
     """
-    global _buffer
-    _buffer = None
+    # 常见写法直接查表, 其余大小写组合才需要 lower()
+    if value in _BOOL_TRUE:
+        return True
+    if value in _BOOL_FALSE:
+        return False
+    # 输入结束时 value 为 None, str.lower 会抛出 TypeError 而非 AttributeError
+    lowered = str.lower(value)
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
 
 
-T = TypeVar("T")
+# 转换函数可缓存、读取函数可预先生成的内置类型
+_BUILTIN_TYPES = (int, float, str, bool)
 
 
-def _read_one_str(sep: Optional[str] = None, file: TextIO = sys.stdin) -> Optional[str]:
+def _converter(typ: Type[T], binary: bool = False) -> Callable[[AnyStr], T]:
     """
-    从输入源读取单个数据
+    获取类型对应的转换函数, 同时校验类型是否可用
 
     参数:
-        sep: 分隔符 (可选)
-        file: 输入源 (默认: sys.stdin)
+        typ: 目标类型
+        binary: 待转换的值是否为 bytes
 
     返回:
-        分割后的第一个字符串部分
+        转换函数; int/float 直接接受 bytes, 其他类型先解码再转换
+    """
+    if typ is bool:
+        convert = _parse_bool
+    elif callable(typ):
+        convert = typ
+    else:
+        raise ValueError(f"Unsupported type: {typ!r}")
+
+    if not binary or typ in (int, float):
+        return convert
+    # 使用 bytes.decode 而非 value.decode(), 输入结束时的 None 会抛出 TypeError
+    if typ is str:
+        return bytes.decode
+    return lambda value: convert(bytes.decode(value))
+
+
+_cached_converter = functools.lru_cache(maxsize=None)(_converter)
+
+
+def _get_converter(typ: Type[T], binary: bool = False) -> Callable[[AnyStr], T]:
+    # 只缓存内置类型; lambda 等每次调用都可能是新对象, 缓存只会被反复冲刷
+    if typ in _BUILTIN_TYPES:
+        return _cached_converter(typ, binary)
+    return _converter(typ, binary)
+
+
+def _transform(typ: Type[T], value: Optional[AnyStr]) -> T:
     """
-    global _buffer
-    if not _buffer:
-        # 从文件或标准输入读取一行数据
-        _buffer = file.readline().strip()
+    将字符串转换为指定类型
 
-    # 按空白或指定分隔符分割缓冲区
-    parts = _buffer.strip().split(sep, 1)
+    """
+    if value is None:
+        raise ValueError(f"Could not convert None to {typ}")
+    if isinstance(value, bytes):
+        value = value.decode()
+    convert = _get_converter(typ)
+    try:
+        return convert(value)
+    except (ValueError, TypeError):
+        if convert is _parse_bool:
+            raise
+        raise ValueError(f"Could not convert {value} to {typ}")
 
-    # 更新缓冲区供下次读取(保留剩余部分)
-    _buffer = parts[1] if len(parts) > 1 else None
 
-    return parts[0] if parts else None
+def _is_flat(typ: list) -> bool:
+    return not any(isinstance(ty, list) for ty in typ)
 
 
-def _read_one(
-    typ: Type[T], sep: Optional[str] = None, file: TextIO = sys.stdin
-) -> Optional[str]:
+def _leaf_types(typ: list) -> list:
     """
-    从输入源读取单个数据并转换为指定类型
+    按顺序展开(可能嵌套的)列表类型, 得到每个元素的类型
 
     """
-    if isinstance(typ, list):  # 如果是列表，循环读取
-        if len(typ) == 0:
-            raise ValueError("List type requires at least one element type")
-        ret = []
-        for ty in typ:
-            value = _read_one(ty, sep, file)
-            if value is not None:
-                ret.append(value)
-            else:
-                raise ValueError("List type requires non-null values")
-        return ret
+    if len(typ) == 0:
+        raise ValueError("List type requires at least one element type")
+    if _is_flat(typ):
+        return typ
+    leaves = []
+    for ty in typ:
+        if isinstance(ty, list):
+            leaves.extend(_leaf_types(ty))
+        else:
+            leaves.append(ty)
+    return leaves
+
+
+def _list_converters(leaves: list, binary: bool) -> Union[Callable, List[Callable]]:
+    """
+    获取列表各元素类型的转换函数
 
-    value = _read_one_str(sep, file)
-    # 处理布尔类型
-    if typ == bool:
-        if value.lower() in ("true", "false"):
-            return value.lower() == "true"
-        raise ValueError(f"Invalid boolean value: {value}")
+    返回:
+        元素类型全部相同时返回单个转换函数, 否则返回逐个对应的列表
+    """
+    first = leaves[0]
+    if leaves.count(first) == len(leaves):
+        return _get_converter(first, binary)
+    return [_get_converter(ty, binary) for ty in leaves]
+
+
+def _rebuild(typ: list, values: Iterator) -> list:
+    """
+    按列表类型的嵌套结构重新组织已转换的值
 
-    # 基础类型转换
+    """
+    if _is_flat(typ):
+        return list(itertools.islice(values, len(typ)))
+    return [
+        _rebuild(ty, values) if isinstance(ty, list) else next(values) for ty in typ
+    ]
+
+
+def _read_list(
+    typ: list,
+    leaves: list,
+    convert: Union[Callable, List[Callable]],
+    sep: Optional[str],
+    reader: _Reader,
+    file: InputFile,
+) -> list:
+    """
+    读取列表类型的数据
+
+    多维列表也一次读取全部元素, 转换后再按结构拆分
+
+    """
+    values = reader.read_strs(len(leaves), sep, file)
     try:
-        return typ(value) if callable(typ) else value
+        if isinstance(convert, list):
+            values = [conv(value) for conv, value in zip(convert, values)]
+        else:
+            # 同类元素: 内置类型可在 C 层循环完成转换
+            values = list(map(convert, values))
     except (ValueError, TypeError):
-        raise ValueError(f"Could not convert {value} to {typ}")
+        # 出错时逐个转换, 以报告具体出错的值
+        values = [_transform(ty, value) for ty, value in zip(leaves, values)]
+
+    if leaves is typ:
+        return values
+    return _rebuild(typ, iter(values))
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_read(types: Tuple, binary: bool) -> Callable:
+    """
+    为一组固定的内置类型生成专用的读取函数(按类型组合缓存)
+
+    生成的函数依次读取并转换每个值, 没有循环和逐个类型的分支判断
+
+    参数:
+        types: 只含 int/float/str/bool 的类型元组
+        binary: 输入源是否为二进制
+
+    返回:
+        读取函数
+    """
+    namespace = {"_transform": _transform, "types": types}
+    lines = ["def _read(reader, sep, file):"]
+    for i, typ in enumerate(types):
+        namespace[f"c{i}"] = _get_converter(typ, binary)
+        lines += [
+            # 当前行还有已切分好的数据时直接取用, 省去 read_str() 的函数调用
+            "    index = reader.index",
+            "    if index < len(reader.tokens) and sep == reader.sep:",
+            "        reader.index = index + 1",
+            "        value = reader.tokens[index]",
+            "    else:",
+            "        value = reader.read_str(sep, file)",
+            "    try:",
+            f"        r{i} = c{i}(value)",
+            "    except (ValueError, TypeError):",
+            # 重新转换: 给出出错的值, 二进制输入源的全角数字等也在此解码后解析
+            f"        r{i} = _transform(types[{i}], value)",
+        ]
+    if len(types) == 1:
+        lines.append("    return r0")
+    else:
+        lines.append(f"    return ({', '.join(f'r{i}' for i in range(len(types)))})")
+
+    exec("\n".join(lines), namespace)
+    return namespace["_read"]
+
+
+# 按类型元组缓存的专用读取函数, 分别对应文本和二进制输入源;
+# 命中时无需再校验类型, 也省去 lru_cache 的参数打包
+_COMPILED_MAX = 128
+_compiled = ({}, {})
 
 
 def read(
     *types: Union[Type[T], list, dict],
     sep: Optional[str] = None,
-    file: TextIO = sys.stdin,
+    file: Optional[InputFile] = None,
 ) -> Union[T, Tuple[T, ...]]:
     """
     读取输入并返回指定类型的值
@@ -86,7 +488,7 @@ def read(
     参数:
         *types: 可变长度类型参数 (int, float, str等)
         sep: 分隔符 (可选)
-        file: 输入源 (默认: sys.stdin)
+        file: 输入源 (默认: sys.stdin, 也可以是 sys.stdin.buffer 等二进制流)
 
     返回:
         单个值或指定类型的值元组
@@ -95,17 +497,104 @@ def read(
         a, b = read(int, float)  # 读取一个整数和一个浮点数
         c = read(str)  # 读取单个字符串
     """
+    global _idle, _idle_ref
+    _idle, _idle_ref = None, _no_file
+    if file is None:
+        # 调用时才取 sys.stdin, 以支持导入后重定向
+        file = sys.stdin
+    if file is _stdin:
+        reader = _default
+    elif _last_ref() is file:
+        # 连续读取同一输入源时省去 _reader() 的函数调用
+        reader = _last_reader
+    else:
+        reader = _reader(file)
 
-    result = []
+    compiled = _compiled[reader.binary]
+    try:
+        read_all = compiled.get(types)
+    except TypeError:
+        # 含列表类型的元组不可哈希, 不会有专用读取函数
+        read_all = None
+    if read_all is not None:
+        return read_all(reader, sep, file)
+    if not types:
+        raise ValueError("At least one type is required")
+    if all(map(_BUILTIN_TYPES.__contains__, types)):
+        if len(compiled) >= _COMPILED_MAX:
+            compiled.clear()
+        read_all = compiled[types] = _compile_read(types, reader.binary)
+        return read_all(reader, sep, file)
+
+    # 读取前先校验全部类型, 并准备好各自的转换函数
+    plans = []
     for typ in types:
-        value = _read_one(typ, sep, file)
+        if isinstance(typ, list):
+            leaves = _leaf_types(typ)
+            plans.append((typ, leaves, _list_converters(leaves, reader.binary)))
+        else:
+            plans.append((typ, None, _get_converter(typ, reader.binary)))
 
-        result.append(value)
+    result = []
+    for typ, leaves, convert in plans:
+        if leaves is not None:
+            result.append(_read_list(typ, leaves, convert, sep, reader, file))
+            continue
+        value = reader.read_str(sep, file)
+        try:
+            result.append(convert(value))
+        except (ValueError, TypeError):
+            result.append(_transform(typ, value))
 
     return result[0] if len(result) == 1 else tuple(result)
 
 
-def readline(file: TextIO = sys.stdin) -> str:
+def read_array(
+    typ: Type[T], n: int, sep: Optional[str] = None, file: Optional[InputFile] = None
+) -> "array.array[T]":
+    """
+    读取 n 个整数或浮点数, 返回紧凑存储的 array.array
+
+    每个元素只占 8 字节, 适合读取大量数值
+
+    参数:
+        typ: 元素类型 (int 或 float)
+        n: 元素数量
+        sep: 分隔符 (可选)
+        file: 输入源 (默认: sys.stdin)
+
+    返回:
+        类型码为 'q' (int) 或 'd' (float) 的 array.array
+
+    示例:
+        arr = read_array(int, 5)  # 读取 5 个整数
+    """
+    # 先按身份判断, 列表等不可哈希的类型也能得到 ValueError
+    if typ is not int and typ is not float:
+        raise ValueError(f"Array type must be int or float, not {typ}")
+    typecode = _ARRAY_TYPECODES[typ]
+    if n <= 0:
+        raise ValueError("Array requires at least one element")
+
+    global _idle, _idle_ref
+    _idle, _idle_ref = None, _no_file
+    if file is None:
+        file = sys.stdin
+    reader = _default if file is _stdin else _reader(file)
+    values = reader.read_strs(n, sep, file)
+    try:
+        try:
+            return array.array(typecode, map(typ, values))
+        except ValueError:
+            if not reader.binary:
+                raise
+            # bytes 只能解析 ASCII 数字, 全角数字等需解码后再转换
+            return array.array(typecode, [typ(value.decode()) for value in values])
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"Could not convert input to {typ} array: {e}")
+
+
+def readline(file: Optional[InputFile] = None) -> str:
     """
     读取一行输入
 
@@ -115,10 +604,28 @@ def readline(file: TextIO = sys.stdin) -> str:
     返回:
         输入的字符串
     """
-    global _buffer
-    if _buffer:
-        ret = _buffer
-        _buffer = None
-        return ret
+    global _idle, _idle_ref
+    # 连续逐行读取同一输入源时当前行必已读完, 无需查看读取状态
+    if file is None:
+        file = sys.stdin
+        if file is _idle:
+            return file.readline().strip()
+    elif _idle_ref() is file or file is _idle:
+        return file.readline().strip()
+
+    if file is _stdin:
+        reader = _default
+    elif _last_ref() is file:
+        reader = _last_reader
     else:
+        reader = _reader(file)
+    if reader.index >= len(reader.tokens):
+        # 当前行已读完: 直接读取新的一行
+        if reader.binary:
+            return file.readline().strip().decode()
+        if reader is _default:
+            _idle = file
+        elif reader is _last_reader:
+            _idle_ref = _last_ref
         return file.readline().strip()
+    return reader.readline(file)
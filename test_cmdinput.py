@@ -1,6 +1,10 @@
 import unittest
+import gc
 import io
-from cmdinput import read, readline, clear_buffer
+import sys
+import weakref
+import cmdinput
+from cmdinput import read, read_array, readline, clear_buffer
 
 
 class TestCmdInput(unittest.TestCase):
@@ -176,6 +180,15 @@ class TestCmdInput(unittest.TestCase):
             self.assertEqual(b, 3)
             self.assertEqual(c, 4)
 
+    def test_readline_after_partial_read(self):
+        """测试连续 readline 之后部分读取一行, 再次 readline 返回该行剩余部分"""
+        input_str = "first\n1 2\nlast\n"
+        with io.StringIO(input_str) as f:
+            self.assertEqual(readline(file=f), "first")
+            self.assertEqual(read(int, file=f), 1)
+            self.assertEqual(readline(file=f), "2")
+            self.assertEqual(readline(file=f), "last")
+
     def test_read_string_with_spaces(self):
         """测试读取带空格的字符串"""
         input_str = "hello world\n"
@@ -287,6 +300,198 @@ class TestCmdInput(unittest.TestCase):
                 cube, [[[1, 2], [3, 4]], [[5, 6], [7, 8]], [[9, 10], [11, 12]]]
             )
 
+    def test_read_binary_lines(self):
+        """测试从二进制流逐行读取多行输入"""
+        input_str = "".join(f"{i} {i * i}\n" for i in range(50)) + "last"
+        with io.BytesIO(input_str.encode()) as f:
+            for i in range(50):
+                self.assertEqual(read(int, int, file=f), (i, i * i))
+            self.assertEqual(f.readline(), b"last")
+
+    def test_read_list_across_lines(self):
+        """测试列表跨行读取并保留剩余部分"""
+        input_str = "1 2\n3\n4 5 6\n"
+        with io.StringIO(input_str) as f:
+            self.assertEqual(read([int] * 4, file=f), [1, 2, 3, 4])
+            self.assertEqual(readline(file=f), "5 6")
+
+    def test_read_list_with_custom_separator(self):
+        """测试使用自定义分隔符读取列表"""
+        input_str = "a, b ,,c\n,\nx\n"
+        with io.StringIO(input_str) as f:
+            lst = read([str] * 6, sep=",", file=f)
+            self.assertEqual(lst, ["a", "b ", "", "c", "", "x"])
+
+    def test_independent_buffers(self):
+        """测试不同输入源的缓冲区互不影响"""
+        with io.StringIO("1 2\n") as f, io.StringIO("3 4\n") as g:
+            self.assertEqual(read(int, file=f), 1)
+            self.assertEqual(read(int, file=g), 3)
+            self.assertEqual(read(int, file=f), 2)
+            self.assertEqual(read(int, file=g), 4)
+
+    def test_clear_buffer_of_one_file(self):
+        """测试只清空指定输入源的缓冲区"""
+        with io.StringIO("1 2\n5\n") as f, io.StringIO("3 4\n") as g:
+            read(int, file=f)
+            read(int, file=g)
+            clear_buffer(f)
+            self.assertEqual(read(int, file=f), 5)
+            self.assertEqual(read(int, file=g), 4)
+
+    def test_readline_keeps_inner_spacing(self):
+        """测试部分读取后 readline 保留剩余部分的原有空白"""
+        input_str = "1   a  b   \n4, x ,y\n"
+        with io.StringIO(input_str) as f:
+            self.assertEqual(read(int, file=f), 1)
+            self.assertEqual(readline(file=f), "a  b")
+            self.assertEqual(read(int, sep=",", file=f), 4)
+            self.assertEqual(readline(file=f), " x ,y")
+
+    def test_read_array(self):
+        """测试读取数值数组"""
+        input_str = "1 2 3\n4 5\n1.5 2.5\n"
+        with io.StringIO(input_str) as f:
+            ints = read_array(int, 5, file=f)
+            self.assertEqual(ints.typecode, "q")
+            self.assertEqual(ints.tolist(), [1, 2, 3, 4, 5])
+            floats = read_array(float, 2, file=f)
+            self.assertEqual(floats.typecode, "d")
+            self.assertEqual(floats.tolist(), [1.5, 2.5])
+
+    def test_read_array_errors(self):
+        """测试读取数值数组出错"""
+        with io.StringIO("1 x\n99999999999999999999\n") as f:
+            with self.assertRaises(ValueError):
+                read_array(str, 1, file=f)
+            with self.assertRaises(ValueError):
+                read_array([int], 2, file=f)
+            with self.assertRaises(ValueError):
+                read_array(int, 0, file=f)
+            with self.assertRaises(ValueError):
+                read_array(int, 2, file=f)
+            with self.assertRaises(ValueError):
+                read_array(int, 1, file=f)
+
+    def test_irregular_nested_list(self):
+        """测试不规则嵌套列表读取"""
+        input_str = "1 a 3\n4 5 6\n"
+        with io.StringIO(input_str) as f:
+            lst = read([int, [str, [float]], int, [int]], file=f)
+            self.assertEqual(lst, [1, ["a", [3.0]], 4, [5]])
+            self.assertEqual(readline(file=f), "6")
+
+    def test_unsupported_type(self):
+        """测试不支持的类型在读取前报错"""
+        with io.StringIO("1 2\n") as f:
+            with self.assertRaises(ValueError):
+                read(int, "x", file=f)
+            self.assertEqual(read(int, int, file=f), (1, 2))
+
+    def test_read_redirected_stdin(self):
+        """测试导入后重定向标准输入"""
+        old_stdin = sys.stdin
+        sys.stdin = io.StringIO("7 8\nline\n")
+        try:
+            self.assertEqual(read(int, int), (7, 8))
+            self.assertEqual(readline(), "line")
+        finally:
+            sys.stdin = old_stdin
+
+    def test_read_binary_stream(self):
+        """测试从二进制流读取"""
+        input_str = "42 3.14 hello True\n1 2 3\na,b\n  whole line  \n你好\n"
+        with io.BytesIO(input_str.encode()) as f:
+            a, b, c, d = read(int, float, str, bool, file=f)
+            self.assertEqual(a, 42)
+            self.assertAlmostEqual(b, 3.14)
+            self.assertEqual(c, "hello")
+            self.assertTrue(d)
+            self.assertEqual(read([int] * 2, file=f), [1, 2])
+            self.assertEqual(readline(file=f), "3")
+            self.assertEqual(read(str, str, sep=",", file=f), ("a", "b"))
+            self.assertEqual(readline(file=f), "whole line")
+            self.assertEqual(read(str, file=f), "你好")
+            with self.assertRaises(ValueError):
+                read(int, file=f)
+            with self.assertRaises(ValueError):
+                read(str, file=f)
+            with self.assertRaises(ValueError):
+                read(bool, file=f)
+            with self.assertRaises(ValueError):
+                read(lambda x: x, file=f)
+
+    def test_read_binary_fullwidth_digits(self):
+        """测试二进制流中的全角数字在单值和列表读取时结果一致"""
+        input_str = "１２ ３\n１２ ３\n１２ ３\n"
+        with io.BytesIO(input_str.encode()) as f:
+            self.assertEqual(read(int, int, file=f), (12, 3))
+            self.assertEqual(read([int] * 2, file=f), [12, 3])
+            self.assertEqual(list(read_array(int, 2, file=f)), [12, 3])
+
+    def test_invalid_types_before_input(self):
+        """测试无效类型在读取输入前报错"""
+        with io.StringIO("1 2\n") as f:
+            with self.assertRaises(ValueError):
+                read(file=f)
+            with self.assertRaises(ValueError):
+                read(int, [[int], []], file=f)
+            self.assertEqual(read(int, int, file=f), (1, 2))
+
+    def test_text_input_not_read_ahead(self):
+        """测试文本输入源不预读后续行, 可与 readline() 混用"""
+        with io.StringIO("1 2\nhello\n3\n") as f:
+            self.assertEqual(read(int, int, file=f), (1, 2))
+            self.assertEqual(f.readline(), "hello\n")
+            self.assertEqual(read(int, file=f), 3)
+
+    def test_reader_released_with_file(self):
+        """测试输入源释放后其读取状态随之回收"""
+        for _ in range(100):
+            read(int, file=io.StringIO("1 2\n"))
+        f = io.BytesIO(b"1 2\n")
+        read(int, file=f)
+        ref = weakref.ref(f)
+        del f
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_unweakrefable_file_keeps_other_state(self):
+        """测试不支持弱引用的输入源不影响其他输入源"""
+
+        class SlottedInput:
+            __slots__ = ("f",)
+
+            def __init__(self, text):
+                self.f = io.StringIO(text)
+
+            def readline(self):
+                return self.f.readline()
+
+        with io.StringIO("1 2\n3 4\n") as f:
+            self.assertEqual(read(int, file=f), 1)
+            self.assertEqual(read(int, file=SlottedInput("5\n")), 5)
+            self.assertEqual(read(int, int, file=f), (2, 3))
+
+    def test_decode_error_propagates(self):
+        """测试输入解码失败时抛出原始的解码错误"""
+        raw = io.BytesIO(b"\xff\n")
+        with io.TextIOWrapper(raw, encoding="utf-8") as f:
+            with self.assertRaises(UnicodeDecodeError):
+                read(int, file=f)
+
+    def test_read_custom_converter_repeatedly(self):
+        """测试反复使用新建的自定义转换函数"""
+        input_str = "1010\n1111 x\n"
+        misses = cmdinput._compile_read.cache_info().misses
+        with io.StringIO(input_str) as f:
+            self.assertEqual(read(lambda x: int(x, 2), file=f), 0b1010)
+            self.assertEqual(read(lambda x: int(x, 2), file=f), 0b1111)
+            with self.assertRaises(ValueError):
+                read(lambda x: int(x, 2), file=f)
+        # 自定义转换函数不生成专用读取函数
+        self.assertEqual(cmdinput._compile_read.cache_info().misses, misses)
+
 
 if __name__ == "__main__":
     unittest.main()